@@ -1,11 +1,4 @@
-
-from .base import Catalog, Module, Node, Package
-from .datacat import (DatasetModule, LicenseModule, OrganizationModule,
-                      ProcessModule, RelationshipModule, ResourceModule,
-                      ToolModule, VocabularyModule, WorkflowModule)
-from .goal import Goal
-from .s3 import BucketModule, FileModule
-from .users import UserModule
+import importlib
 
 __all__ = [
     "Catalog",
@@ -20,8 +13,8 @@ __all__ = [
     "WorkflowModule",
     "ProcessModule",
     "ToolModule",
-    "RelationshipModule",  # Assuming this is defined elsewhere
-    "LicenseModule",  
+    "RelationshipModule",
+    "LicenseModule",
     "ResourceModule",
     "OrganizationModule",
 
@@ -32,3 +25,42 @@ __all__ = [
     # modules for users
     "UserModule",
 ]
+
+# Submodules are imported on first access to one of their names (PEP 562),
+# so that scripts which only need a few module classes do not pay for loading
+# the catalog, S3 and user subsystems (and their client dependencies).
+_LAZY = {
+    "Catalog": ".base",
+    "Module": ".base",
+    "Package": ".base",
+    "Node": ".base",
+    "Goal": ".goal",
+
+    "DatasetModule": ".datacat",
+    "VocabularyModule": ".datacat",
+    "WorkflowModule": ".datacat",
+    "ProcessModule": ".datacat",
+    "ToolModule": ".datacat",
+    "RelationshipModule": ".datacat",
+    "LicenseModule": ".datacat",
+    "ResourceModule": ".datacat",
+    "OrganizationModule": ".datacat",
+
+    "BucketModule": ".s3",
+    "FileModule": ".s3",
+
+    "UserModule": ".users",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    mod = importlib.import_module(_LAZY[name], __name__)
+    obj = getattr(mod, name)
+    globals()[name] = obj
+    return obj
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -5,31 +5,102 @@ Set up testing environment for the project.
 from __future__ import annotations
 
 import re
+import sys
+from array import array
+from types import MappingProxyType
 # from typing import TYPE_CHECKING, Callable    
-from collections import deque
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from stelar.client import Client
 
+# The collection types accepted wherever one or several nodes can be given
+_LIST_SET = (list, set, tuple)
+
+
+def _flatten(items):
+    """Iterate over the items of a collection, descending into nested collections.
+
+    Args:
+        items (list | set | tuple): The collection to flatten.
+    """
+    stack = [iter(items)]
+    while stack:
+        for x in stack[-1]:
+            if isinstance(x, _LIST_SET):
+                stack.append(iter(x))
+                break
+            yield x
+        else:
+            stack.pop()
+
 
 class Catalog:
     def __init__(self):
         self.root = {}
         self.goal = {}
+        # Client cursors and registries used by the modules, by name; see cursor()
+        self._cursors: dict[str, object] = {}
+        self._registries: dict[str, object] = {}
         self.client: Client = None
+        self._packages: dict[str, Package] = {}
+        self._plans: dict[frozenset, tuple[list[Module], list[Module]]] = {}
+        self._all_modules: list[Module] | None = None
+        # The requirement graph over integer module ids; see _graph()
+        self._graph_cache: tuple | None = None
+        # Whether the scc_index of the modules must be recomputed
+        self._sci_dirty = True
+        # All nodes of this catalog, by full name
+        self._by_fullname: dict[str, Node] = {}
+
+    @property
+    def client(self) -> Client:
+        """The client of the KLMS this catalog is installed to."""
+        return self._client
+
+    @client.setter
+    def client(self, client: Client):
+        self._client = client
+        self._cursors.clear()
+        self._registries.clear()
+
+    def cursor(self, name: str):
+        """Get a cursor of the client by attribute name, e.g., 'datasets'.
+
+        Cursors are cached until the client is replaced.
+        """
+        cursor = self._cursors.get(name)
+        if cursor is None:
+            cursor = self._cursors[name] = getattr(self._client, name)
+        return cursor
+
+    def registry_for_type(self, type_name: str):
+        """Get the registry of the client for an entity type name, e.g., 'dataset'.
+
+        Registries are cached until the client is replaced.
+        """
+        registry = self._registries.get(type_name)
+        if registry is None:
+            registry = self._registries[type_name] = self._client.registry_for_type(type_name)
+        return registry
 
     def add(self, child):
         """Add a child node to this catalog.
 
         Args:
-            child (Node): The child node to add.
+            child (Node | list[Node]): The child node(s) to add.
         """
-        if isinstance(child, list | set):
-            for c in child:
-                self.add(c)
-            return
+        try:
+            if isinstance(child, _LIST_SET):
+                for c in _flatten(child):
+                    self._add_one(c)
+            else:
+                self._add_one(child)
+        finally:
+            # Also when a later child is rejected, since earlier ones were added
+            self.invalidate()
 
+    def _add_one(self, child):
         if not isinstance(child, Node):
             raise ValueError("Child must be a Node")
         if child.name in self.root:
@@ -41,8 +112,25 @@ class Catalog:
 
         # Add the child to this catalog's root
         child.catalog = self
+        child._update_subtree()
         self.root[child.name] = child
 
+    def invalidate(self, nodes: bool = True):
+        """Drop all data derived from the structure of this catalog.
+
+        The method is called whenever nodes or requirements are added. Code that
+        changes the structure of the catalog by other means must call it.
+
+        Args:
+            nodes (bool): If False, only requirements have changed, and the data
+                derived from the set of modules (the module list) is kept.
+        """
+        self._plans.clear()
+        self._graph_cache = None
+        self._sci_dirty = True
+        if nodes:
+            self._all_modules = None
+
     def __iadd__(self, child):
         """Add a child node to this catalog.
 
@@ -59,16 +147,7 @@ class Catalog:
             name (str): The name of the child node to get.
             default (Node): The default value to return if the child node is not found. Defaults to None.
         """
-        names = fullname.split(".")
-        if len(names) == 0:
-            raise ValueError(f"Name must be a non-empty string, got {fullname}")
-        d = self.root
-        for name in names:
-            if name not in d:
-                return default
-            obj = d[name]
-            d = obj.children
-        return obj
+        return self._by_fullname.get(fullname, default)
 
     def __getitem__(self, fullname):
         """Get an attribute of this catalog.
@@ -86,55 +165,130 @@ class Catalog:
         Args:
             name (str): The name of the child node to check.
         """
-        return self.get(fullname) is not None
+        return fullname in self._by_fullname
 
     def get_package(self, fullname: str) -> Package:
         """Get a package by name, creating it if it does not exist.
 
+        Packages are never removed from a catalog, so the result is memoized.
+
         Args:
             fullname (str): The name of the package to get.
         """
+        pkg = self._packages.get(fullname)
+        if pkg is None:
+            pkg = self._packages[fullname] = self._build_package(fullname)
+        return pkg
+
+    def _build_package(self, fullname: str) -> Package:
         names = fullname.split(".")
         if len(names) == 0:
             raise ValueError(f"Name must be a non-empty string, got {fullname}")
-        obj = self
+        obj = None
         d = self.root
+        created = False
         for name in names:
             if name not in d:
                 p = Package(name)
-                obj.add(p)
+                self._add_fast(obj, p)
+                created = True
                 obj = p
+                d = p.children
             else:
                 obj = d[name]
                 if not isinstance(obj, Package):
                     raise ValueError(f"Name {fullname} is not a package")
                 d = obj.children
+        if created:
+            self.invalidate()
         return obj
 
+    def _add_fast(self, parent: Package | None, child: Package):
+        """Attach a new, empty package to a node of this catalog, or to its root.
+
+        Unlike add(), the method performs no checks, and does not invalidate the
+        catalog; the caller is responsible for both.
+        """
+        if parent is None:
+            child._fullname = child.name
+            self.root[child.name] = child
+        else:
+            child.parent = parent
+            child._fullname = sys.intern(f"{parent._fullname}.{child.name}")
+            parent.children[child.name] = child
+        child.catalog = self
+        self._by_fullname[child._fullname] = child
+
     def modules(self):
         """Return the modules in this catalog.
 
         The method returns an iterable of all the modules in this catalog, including sub-modules.
         """
-        for child in self.root.values():
-            if isinstance(child, Module):
-                yield child
-            elif isinstance(child, Package):
-                yield from child.modules()
-            else:
-                raise ValueError(f"Child {child.name} is not a module or a package")
-            
+        return _walk_modules(self.root.values(), submodules=False)
+
     def all_modules(self):
         """Return an iterator over all modules and submodules in this catalog.
+
+        The list of modules is cached until the catalog structure changes.
         """
-        for child in self.root.values():
-            if isinstance(child, Module):
-                yield child
-                yield from child.all_submodules()
-            elif isinstance(child, Package):
-                yield from child.all_modules()
-            else:
-                raise ValueError(f"Child {child.name} is not a module or a package")
+        if self._all_modules is None:
+            self._all_modules = list(self._iter_all_modules())
+        return iter(self._all_modules)
+
+    def _iter_all_modules(self):
+        return _walk_modules(self.root.values(), submodules=True)
+
+    def _graph(self) -> tuple[list[Module], dict[Module, int], list[list[int]], list[list[int]]]:
+        """Return the requirement graph of this catalog over integer module ids.
+
+        The graph is returned as a tuple (modules, ids, required, enabled), where
+        modules[i] is the module with id i, ids maps modules to ids, and required[i]
+        and enabled[i] are the ids of modules[i].required and modules[i].enabled.
+        Modules of other catalogs that are reachable through requirements are given
+        ids after the modules of this catalog.
+
+        The graph is cached until nodes or requirements are added.
+        """
+        if self._graph_cache is None:
+            modules = list(self.all_modules())
+            ids = {m: i for i, m in enumerate(modules)}
+            required = []
+            enabled = []
+            i = 0
+            while i < len(modules):
+                m = modules[i]
+                for adj, edges in ((required, m.required), (enabled, m.enabled)):
+                    row = []
+                    for n in edges:
+                        j = ids.get(n)
+                        if j is None:
+                            j = ids[n] = len(modules)
+                            modules.append(n)
+                        row.append(j)
+                    adj.append(row)
+                i += 1
+            self._graph_cache = (modules, ids, required, enabled)
+        return self._graph_cache
+
+    def refresh_installed(self, modules=None):
+        """Fetch the installed state of the modules whose state is not known.
+
+        The modules are grouped by class and catalog, and each class checks its
+        modules with a single call to bulk_check_installed().
+
+        Args:
+            modules (Iterable[Module]): The modules to check. Defaults to all the
+                modules of this catalog.
+        """
+        if modules is None:
+            modules = self.all_modules()
+        groups: dict[tuple[type, Catalog], list[Module]] = {}
+        for m in modules:
+            if m._installed is None:
+                groups.setdefault((type(m), m.catalog), []).append(m)
+        for (cls, _), group in groups.items():
+            for m, installed in cls.bulk_check_installed(group).items():
+                m._installed = installed
 
     def strongly_connected_index(self) -> dict[str, int]:
         """Compute the strongly connected index for a set of modules.
@@ -149,51 +303,80 @@ class Catalog:
 
         This assumes that for mutually required modules the installation/uninstall 
         order does not matter.
-        """
-
-        # This implementation is based on the SCC algorithm from Kosaraju
-        # and Tarjan, which is a linear time algorithm for finding strongly connected components
 
-        for m in self.all_modules():
-            m.scc_index = None
-
-        # First, iterate over all modules and start a DFS from each
-        visited = set()
-        stack = deque(('visit', m) for m in self.all_modules())
-
-        # L is a stack of modules to be postvisited
-        L = deque()
-
-        while stack:
-            # Visit the top of the stack
-            top = stack.pop()
-            match top:
-                case ('visit', m):
-                    # If top is unvisited, mark it as visited and add it to the stack
-                    if m not in visited:
-                        visited.add(m)
-                        stack.append(('push', m))
-                        for n in m.enabled:
-                            stack.append(('visit', n))
-                case ('push', m):
-                    # If top is postvisited, add it to the list
-                    L.append((m, m))
-                case _:
-                    raise ValueError(f"Unknown command {top[0]} in stack")
+        The computation is skipped if the catalog has not changed since the last one.
+        """
+        if not self._sci_dirty:
+            return
 
+        # This is an iterative version of Tarjan's algorithm, run on the 'required'
+        # edges. Tarjan emits each SCC after all the SCCs it can reach, that is,
+        # after all its requirements; numbering the SCCs in emission order gives
+        # the properties above.
+
+        # The graph is over dense integer module ids, which index the arrays below
+        modules, _, required, _ = self._graph()
+        n = len(modules)
+        index = array("i", [-1]) * n
+        lowlink = array("i", [0]) * n
+        onstack = bytearray(n)
+
+        # Tarjan's stack of module ids
+        S = []
+        counter = 0
         scc_index = 0
 
-        # Iterate over L and start a DFS in the reverse direction
-        while L:
-            m, sccbase = L.pop()
-            if m.scc_index is None:
-                if m is sccbase:
-                    sccbase.scc_index = scc_index
-                    scc_index += 1
+        for root in range(n):
+            if index[root] >= 0:
+                continue
+            index[root] = lowlink[root] = counter
+            counter += 1
+            S.append(root)
+            onstack[root] = 1
+
+            # The DFS stack is kept in two parallel lists: the module ids, and
+            # iterators over their requirements, which are resumed when the DFS
+            # returns to the module
+            nodes = [root]
+            iters = [iter(required[root])]
+            while nodes:
+                v = nodes[-1]
+                for w in iters[-1]:
+                    if index[w] < 0:
+                        # Descend into an unvisited module
+                        index[w] = lowlink[w] = counter
+                        counter += 1
+                        S.append(w)
+                        onstack[w] = 1
+                        nodes.append(w)
+                        iters.append(iter(required[w]))
+                        break
+                    elif onstack[w] and index[w] < lowlink[v]:
+                        lowlink[v] = index[w]
                 else:
-                    m.scc_index = sccbase.scc_index
-                for n in m.required:
-                    L.append((n, sccbase))
+                    # All requirements of v are done
+                    nodes.pop()
+                    iters.pop()
+                    if nodes:
+                        u = nodes[-1]
+                        if lowlink[v] < lowlink[u]:
+                            lowlink[u] = lowlink[v]
+                    if lowlink[v] == index[v]:
+                        # v is the root of an SCC
+                        while True:
+                            w = S.pop()
+                            onstack[w] = 0
+                            modules[w].scc_index = scc_index
+                            if w == v:
+                                break
+                        scc_index += 1
+
+        # The modules of other catalogs, which follow the modules of this catalog
+        # in the graph, were numbered for this catalog
+        for m in modules[len(self._all_modules):]:
+            if m.catalog is not None and m.catalog is not self:
+                m.catalog._sci_dirty = True
+        self._sci_dirty = False
 
 
 # Now, iterate over all modules and set the SCI
@@ -210,10 +393,13 @@ def check_node_name(name: str):
     """
     if not isinstance(name, str):
         raise ValueError(f"Name must be a string, got {type(name)}")
-    if not NODE_NAME_REGEX.match(name):
-        raise ValueError(f"Name must match regex {NODE_NAME_REGEX.pattern}, got {name}")
     if len(name) > 255:
         raise ValueError(f"Name must be less than 255 characters, got {len(name)}")
+    # Equivalent to NODE_NAME_REGEX, without invoking the regex engine: an ASCII
+    # identifier in which '-' may appear, but not as the first or last character.
+    if not (name.isascii() and name.replace("-", "_").isidentifier()
+            and name[0] != "-" and name[-1] != "-"):
+        raise ValueError(f"Name must match regex {NODE_NAME_REGEX.pattern}, got {name}")
 
 
 class Node:
@@ -229,9 +415,9 @@ class Node:
     packages.
     """
 
-    catalog : Catalog = None  # The catalog this node belongs to
+    __slots__ = ("name", "parent", "children", "catalog", "_fullname")
 
-    def __init__(self, name: str, parent: Node | None = None):
+    def __init__(self, name: str, parent: Node | None = None, /):
         """Initialize a node.
         Args:
             name (str): The name of the node.
@@ -241,6 +427,8 @@ class Node:
         self.name = name
         self.parent = parent
         self.children = {}
+        self.catalog: Catalog = None  # The catalog this node belongs to
+        self._fullname = name
         if parent is not None:
             parent.add(self)
 
@@ -250,7 +438,7 @@ class Node:
         Args:
             child (Node): The child node to add.
         """
-        if not isinstance(child, Package | Module):
+        if not isinstance(child, _PKG_OR_MOD):
             raise ValueError("Child must be a Package or Module")
         if child.name in self.children:
             raise ValueError(f"Child with name {child.name} already exists")
@@ -263,15 +451,54 @@ class Node:
         if child.parent is None:
             child.parent = self
         child.catalog = self.catalog
+        child._fullname = sys.intern(f"{self._fullname}.{child.name}")
+        child._update_subtree()
         self.children[child.name] = child
+        if self.catalog is not None:
+            self.catalog.invalidate()
+
+    def _update_subtree(self):
+        """Propagate the catalog and full name of this node to all its descendants.
+
+        The method is called when the node is attached, since the descendants of a
+        node may have been added before the node itself had a parent or catalog.
+        If the node is in a catalog, the subtree is also entered in the catalog index.
+        """
+        index = self.catalog._by_fullname if self.catalog is not None else None
+        if index is not None:
+            index[self._fullname] = self
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Module):
+                # The node may have been attached below another module
+                node._top_module = None
+            for child in node.children.values():
+                child.catalog = node.catalog
+                child._fullname = sys.intern(f"{node._fullname}.{child.name}")
+                if index is not None:
+                    index[child._fullname] = child
+                stack.append(child)
+
+    def extend(self, children):
+        """Add several child nodes to this node.
+
+        Args:
+            children (Iterable[Node]): The child nodes to add, in order.
+        """
+        for child in children:
+            self.add(child)
 
     def __iadd__(self, child):
-        """Add a child node to this node.
+        """Add a child node, or a list of child nodes, to this node.
 
         Args:
-            child (Node): The child node to add.
+            child (Node | list[Node] | tuple[Node]): The child node(s) to add.
         """
-        self.add(child)
+        if isinstance(child, _LIST_SET):
+            self.extend(child)
+        else:
+            self.add(child)
         return self
 
     def ancestors(self):
@@ -292,8 +519,9 @@ class Node:
         """Get the full name of this node.
 
         The full name is the name of this node, plus the names of all its parents, separated by dots.
+        It is computed, and interned, when the node is attached to its parent.
         """
-        return ".".join(a.name for a in reversed(self.ancestors()))
+        return self._fullname
 
     def __getitem__(self, name):
         """Get a child node by name.
@@ -333,6 +561,9 @@ class Package(Node):
 
     In fact, modules are a special kind of a package, which can have sub-modules but not sub-packages.
     """
+
+    __slots__ = ()
+
     def __init__(self, name: str, parent: Package | None = None):
         super().__init__(name, parent)
 
@@ -341,23 +572,70 @@ class Package(Node):
 
         The method returns an iterable of all the modules in this package, including sub-modules.
         """
-        for child in self.children.values():
-            if isinstance(child, Module):
-                yield child
-            elif isinstance(child, Package):
-                yield from child.modules()
-            else:
-                raise ValueError(f"Child {child.name} is not a module or a package")
+        return _walk_modules(self.children.values(), submodules=False)
 
     def all_modules(self):
-        for child in self.children.values():
-            if isinstance(child, Module):
-                yield child
-                yield from child.all_submodules()
-            elif isinstance(child, Package):
-                yield from child.all_modules()
-            else:
-                raise ValueError(f"Child {child.name} is not a module or a package")
+        return _walk_modules(self.children.values(), submodules=True)
+
+
+def _walk_modules(nodes, submodules: bool):
+    """Iterate over the modules in a sequence of nodes, descending into packages.
+
+    The walk uses an explicit stack instead of nested generators, and yields the
+    modules in pre-order, in the order the nodes were added.
+
+    Args:
+        nodes (Iterable[Node]): The nodes to walk.
+        submodules (bool): If True, also yield the submodules of the modules found.
+    """
+    stack = list(nodes)
+    stack.reverse()
+    while stack:
+        child = stack.pop()
+        if isinstance(child, Module):
+            yield child
+            if submodules and child.children:
+                stack.extend(reversed(child.children.values()))
+        elif isinstance(child, Package):
+            stack.extend(reversed(child.children.values()))
+        else:
+            raise ValueError(f"Child {child.name} is not a module or a package")
+
+
+# The page size used to list the entities of a client cursor
+_LIST_PAGE = 100
+
+
+def _check_installed_by_listing(modules: list[Module], key: str) -> dict[Module, bool]:
+    """Check if modules are installed, listing the entity names of their cursor once.
+
+    The modules must all be of the same class, with a CURSOR_NAME, and in the same
+    catalog; the name of the entity of each module is spec[key]. A module whose name
+    is not listed is checked with check_installed(), since the listing may leave out
+    entities that a lookup finds (e.g., when it is looked up by id, or the entity is
+    not active). Some list endpoints return entities instead of names; the name is
+    then entity[key].
+    """
+    m0 = modules[0]
+    cursor = m0.catalog.cursor(m0.CURSOR_NAME)
+    names = set()
+    offset = 0
+    while True:
+        page = cursor.fetch_list(limit=_LIST_PAGE, offset=offset)
+        seen = len(names)
+        names.update(item if isinstance(item, str) else item[key] for item in page)
+        # Some cursors (e.g., users) ignore limit and offset and return everything
+        # on each call; a page that adds no new names ends the listing
+        if len(page) < _LIST_PAGE or len(names) == seen:
+            break
+        offset += len(page)
+    return {m: m.spec[key] in names or m.check_installed() for m in modules}
+
+
+# Shared, immutable initial values for modules without a spec or requirement edges.
+# The edge lists of a module are created when the first edge is added.
+_EMPTY_SPEC = MappingProxyType({})
+_NO_EDGES = ()
 
 
 class Module(Node):
@@ -399,12 +677,36 @@ class Module(Node):
     - DISABLED: The module is disabled on the KLMS, i.e., its requirements are not installed.
     """
 
-    def __init__(self, name:str, parent: Node | None =None, *, spec={}):
+    __slots__ = ("spec", "required", "enabled", "_installed", "scc_index", "_top_module")
+
+    # Whether a class overrides the corresponding hook; set by __init_subclass__, so
+    # that do_install() and do_uninstall() do not call the empty base hooks
+    _has_pre_install = _has_post_install = False
+    _has_pre_uninstall = _has_post_uninstall = False
+
+    # The class name without the 'Module' suffix, padded for the log; set by __init_subclass__
+    _label_prefix = " " * 12
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for hook in ("pre_install", "post_install", "pre_uninstall", "post_uninstall"):
+            setattr(cls, f"_has_{hook}", getattr(cls, hook) is not getattr(Module, hook))
+        clsname = cls.__name__
+        if clsname.endswith("Module"):
+            clsname = clsname[:-6]
+        cls._label_prefix = f"{clsname:<12}"
+
+    def __init__(self, name:str, parent: Node | None =None, *, spec=None, requires=()):
         super().__init__(name, parent)
-        self.spec = spec
-        self.required = set()
-        self.enabled = set()
+        self.spec = spec if spec is not None else _EMPTY_SPEC
+        # Requirement edges, in insertion order and without duplicates
+        self.required: list[Module] | tuple[()] = _NO_EDGES
+        self.enabled: list[Module] | tuple[()] = _NO_EDGES
         self._installed = None
+        self.scc_index = None
+        self._top_module = None
+        if requires:
+            self.require(requires)
 
     def add(self, child):
         """Add a child node to this node.
@@ -419,28 +721,63 @@ class Module(Node):
         """Add a requirement to this module.
 
         Args:
-            module (Module): The module to require.
+            req (Module | Package | str | list): The requirement(s) to add.
         """
-        if isinstance(req, list | set):
-            for r in req:
-                self.require(r)
-            return
-        
+        if isinstance(req, _LIST_SET):
+            for r in _flatten(req):
+                self._require_one(r)
+        else:
+            self._require_one(req)
+
+    def _require_one(self, req):
         if isinstance(req, str):
-            req = self.catalog.get(req)
-        if req is None:
-            raise ValueError(f"Adding {req} to {self.fullname}: requirement {req} not found")
-        if not isinstance(req, Node):
-            raise ValueError(f"Adding {req} to {self.fullname}: requirement must be a module or a package")
-        
-        if isinstance(req, Package):
-            for m in req.modules():
-                self.required.add(m)
-                m.enabled.add(self)
+            if self.catalog is None:
+                raise ValueError(f"Adding {req} to {self.fullname}: a module outside a catalog cannot require by name")
+            name = req
+            req = self.catalog._by_fullname.get(name)
+            if req is None:
+                raise ValueError(f"Adding {name} to {self.fullname}: requirement {name} not found")
+
+        if isinstance(req, Module):
+            self._add_requirement(req)
+        elif isinstance(req, Package):
+            self._add_requirements(req.modules())
         else:
-            assert isinstance(req, Module)
-            self.required.add(req)
-            req.enabled.add(self)
+            raise ValueError(f"Adding {req} to {self.fullname}: requirement must be a module or a package")
+
+        for cat in (self.catalog, req.catalog):
+            if cat is not None:
+                cat.invalidate(nodes=False)
+
+    def _add_requirement(self, m: Module):
+        # The edge lists are short, so a linear membership test is cheap
+        if m in self.required:
+            return
+        if self.required is _NO_EDGES:
+            self.required = []
+        self.required.append(m)
+        if m.enabled is _NO_EDGES:
+            m.enabled = []
+        m.enabled.append(self)
+
+    def _add_requirements(self, mods):
+        # A package may hold many modules, so test membership against a set
+        # built once, rather than scanning the edge list for each module
+        have = set(self.required)
+        new = []
+        for m in mods:
+            if m not in have:
+                have.add(m)
+                new.append(m)
+        if not new:
+            return
+        if self.required is _NO_EDGES:
+            self.required = []
+        self.required.extend(new)
+        for m in new:
+            if m.enabled is _NO_EDGES:
+                m.enabled = []
+            m.enabled.append(self)
 
     @property
     def is_submodule(self):
@@ -454,8 +791,12 @@ class Module(Node):
         """Get the top-level module of this module.
 
         A top-level module is a module that has no parent.
+        The result is cached until the module is attached to a new parent.
         """
-        return self.parent.top_module if self.is_submodule else self
+        top = self._top_module
+        if top is None:
+            top = self._top_module = self.parent.top_module if self.is_submodule else self
+        return top
 
     def submodules(self):
         """Get the sub-modules of this module.
@@ -473,9 +814,7 @@ class Module(Node):
         
         Submodules of submodules will be returned.
         """
-        for child in self.children.values():
-            yield child
-            yield from child.all_submodules()
+        return _walk_modules(self.children.values(), submodules=True)
 
     def check_installed(self) -> bool:
         """Check if this module is installed.
@@ -483,6 +822,26 @@ class Module(Node):
         The method returns True if this module is installed, False otherwise.
         """
         raise NotImplementedError("is_installed() not implemented in Module class")
+
+    def clear_cache(self):
+        """Forget any KLMS data cached by this module.
+
+        The method is called at the start of a reconciliation. Subclasses that
+        cache data read from the KLMS override it; the default does nothing.
+        """
+
+    @classmethod
+    def bulk_check_installed(cls, modules: list[Module]) -> dict[Module, bool]:
+        """Check if several modules of this class are installed.
+
+        Subclasses can override this method to query the KLMS once for all the
+        given modules, which are all in the same catalog. The default implementation
+        calls check_installed() on each.
+
+        Returns:
+            dict: The installed state of each module.
+        """
+        return {m: m.check_installed() for m in modules}
     
     @property
     def installed(self):
@@ -500,24 +859,24 @@ class Module(Node):
 
         The method sets the installed state of this module to the given value.
         """
-        if not isinstance(value, bool | None):
+        if value is not None and not isinstance(value, bool):
             raise ValueError(f"Installed state must be a boolean, got {value}")
         self._installed = value
 
     def _label(self):
-        clsname = self.__class__.__name__
-        if clsname.endswith("Module"):
-            clsname = clsname[:-6]
-        return f"{clsname:<12} {self.fullname:<32}"
+        return f"{self._label_prefix} {self._fullname:<32}"
 
     def do_install(self):
-        self.pre_install()
+        if self._has_pre_install:
+            self.pre_install()
         if not self.installed:
             print("Install", self._label(), ": installing")
             self.install()
+            self._installed = True
         else:
             print("Install", self._label(), ": unchanged")
-        self.post_install()
+        if self._has_post_install:
+            self.post_install()
 
     def pre_install(self):
         """Called before install.
@@ -533,13 +892,16 @@ class Module(Node):
         pass
 
     def do_uninstall(self):
-        self.pre_uninstall()
+        if self._has_pre_uninstall:
+            self.pre_uninstall()
         if self.installed:
             print("Uninstall", self._label(), ": uninstalling")
             self.uninstall()
+            self._installed = False
         else:
             print("Uninstall", self._label(), ": unchanged")
-        self.post_uninstall()
+        if self._has_post_uninstall:
+            self.post_uninstall()
 
     def pre_uninstall(self):
         pass
@@ -560,6 +922,7 @@ class Module(Node):
         The method uninstalls this module from the KLMS.
         """
         raise NotImplementedError("uninstall() not implemented in Module class")
-    
 
 
+# The node types that can be children of a node; defined here, after Module
+_PKG_OR_MOD = (Package, Module)
@@ -4,12 +4,15 @@ from typing import TYPE_CHECKING, Optional
 
 from stelar.client import Rel, Relationship
 
-from .base import Module, Node
+from .base import Module, Node, _check_installed_by_listing
 from .s3 import FileModule
 
 if TYPE_CHECKING:
     from stelar.client.package import PackageProxy
 
+# Marks a resource attribute that does not exist
+_MISSING = object()
+
 
 class PackageModule(Module):
     """A module that installs a package.
@@ -18,14 +21,26 @@ class PackageModule(Module):
     entity.
     """
 
+    __slots__ = ("_installed_proxy", "_resources_cache", "_resource_index")
+
     def __init__(self, name: str, parent: Optional[Node] = None, *, spec: dict):
         super().__init__(name, parent, spec=spec)
         self.spec = spec
         if "name" not in spec:
             spec["name"] = name
-        
+        # The proxy of the installed package, its resources, and the same resources
+        # by name, shared by the ResourceModule children
+        self._installed_proxy = _MISSING
+        self._resources_cache = None
+        self._resource_index = None
+
+    def clear_cache(self):
+        self._installed_proxy = _MISSING
+        self._resources_cache = None
+        self._resource_index = None
+
     def cursor(self):
-        return getattr(self.catalog.client, self.CURSOR_NAME)
+        return self.catalog.cursor(self.CURSOR_NAME)
 
     def installed_instance(self):
         return self.cursor().get(self.spec["name"])
@@ -37,6 +52,10 @@ class PackageModule(Module):
         """
         return self.spec["name"] in self.cursor()
 
+    @classmethod
+    def bulk_check_installed(cls, modules):
+        return _check_installed_by_listing(modules, "name")
+
     def install(self):
         """Install the package.
 
@@ -45,6 +64,7 @@ class PackageModule(Module):
         """
         cursor = self.cursor()
         cursor.create(** self.spec)
+        self.clear_cache()
 
     def uninstall(self):
         """Uninstall the package.
@@ -54,8 +74,9 @@ class PackageModule(Module):
         """
         cursor = self.cursor()
         cursor.get(self.spec["name"]).delete()
+        self.clear_cache()
 
-    def add_resource(self, name, file: FileModule | None = None, spec: dict = {}):
+    def add_resource(self, name, file: FileModule | None = None, spec: dict | None = None):
         """Add a resource to the dataset.
 
         The method adds a resource to the dataset. The resource is defined by
@@ -68,18 +89,14 @@ class PackageModule(Module):
         Returns:
             ResourceModule: The resource module that was added to the dataset.
         """
-        aspec = spec.copy()
+        aspec = {} if spec is None else spec.copy()
 
-        requires = [self]
+        requires = []
         if isinstance(file, FileModule):
             aspec["url"] = file.url
             requires.append(file)
 
-        res_module = ResourceModule(name, parent=self, spec=aspec)
-        for r in requires:
-            res_module.require(r)
-
-        return res_module
+        return ResourceModule(name, parent=self, spec=aspec, requires=requires)
     
 
 
@@ -89,6 +106,9 @@ class DatasetModule(PackageModule):
     A STELAR dataset is defined in the data catalog. It is a package-derived 
     entity.
     """
+
+    __slots__ = ()
+
     CURSOR_NAME = "datasets"
 
 
@@ -100,40 +120,73 @@ class ResourceModule(Module):
     entity.
     """
 
+    __slots__ = ()
+
     parent : PackageModule
 
-    def __init__(self, name: str, parent: PackageModule, *, spec: dict = {}):
-        super().__init__(name, parent=parent, spec=spec)
-        self.require(parent)
+    def __init__(self, name: str, parent: PackageModule, *, spec: dict | None = None, requires=()):
+        super().__init__(name, parent, spec=spec, requires=[parent, requires])
 
     def parent_cursor(self):
-        cli = self.catalog.client
         ptype = self.spec.get("package_type", "dataset")
-        return cli.registry_for_type(ptype)
+        return self.catalog.registry_for_type(ptype)
 
     def parent_instance(self) -> Optional[PackageProxy]:
         """Get the parent package instance.
         
+        The instance is fetched once and shared by all the resources of the same
+        parent, until the parent or one of its resources is installed or uninstalled.
+
         Returns:
             PackageModule: The parent package instance if it is installed, 
             otherwise None.
         """
-        cli = self.catalog.client
-        if self.parent.installed:
-            ptype = self.spec.get("package_type", "dataset")
-            cursor = self.parent_cursor()
-            return cursor.get(self.parent.spec["name"])
-        else:
-            return None
+        parent = self.parent
+        proxy = parent._installed_proxy
+        if proxy is _MISSING:
+            if parent.installed:
+                proxy = self.parent_cursor().get(parent.spec["name"])
+            else:
+                proxy = None
+            parent._installed_proxy = proxy
+        return proxy
+
+    def parent_resources(self) -> list:
+        """Get the resources of the parent package instance.
+
+        The list is fetched once and shared by all the resources of the same
+        parent, until the parent or one of its resources is installed or uninstalled.
+        """
+        parent = self.parent
+        if parent._resources_cache is None:
+            dset = self.parent_instance()
+            parent._resources_cache = list(dset.resources) if dset is not None else []
+        return parent._resources_cache
+
+    def parent_resource_index(self) -> dict[str, list]:
+        """Get the resources of the parent package instance, by name.
+
+        The index is cached along with parent_resources().
+        """
+        parent = self.parent
+        if parent._resource_index is None:
+            index = {}
+            for res in self.parent_resources():
+                index.setdefault(getattr(res, "name", None), []).append(res)
+            parent._resource_index = index
+        return parent._resource_index
 
     def find_in_parent(self):
-        # Get the parent package
-        cli = self.catalog.client
-        dset = self.parent_instance()
-        if dset is not None:
-            for res in dset.resources:
-                if self.matches(res):
-                    return res
+        # Resources are usually specified by name; only resources with that name
+        # can match
+        name = self.spec.get("name", _MISSING)
+        if name is _MISSING:
+            candidates = self.parent_resources()
+        else:
+            candidates = self.parent_resource_index().get(name, ())
+        for res in candidates:
+            if self.matches(res):
+                return res
         return None
 
     def check_installed(self):
@@ -145,19 +198,22 @@ class ResourceModule(Module):
 
         The method checks if the resource matches the spec.
         """
+        # Resource fields are descriptors, so each key needs a getattr(); the
+        # sentinel avoids a separate hasattr() lookup
         return all(
-            hasattr(res, k) and v == getattr(res, k)
-
+            getattr(res, k, _MISSING) == v
             for k, v in self.spec.items())
 
     def install(self):
         parent_dset = self.parent_instance()
         parent_dset.add_resource(**self.spec)
+        self.parent.clear_cache()
 
     def uninstall(self):
         resource = self.find_in_parent()
         if resource is not None:
             resource.delete()
+            self.parent.clear_cache()
 
 
 class ToolModule(PackageModule):
@@ -166,6 +222,9 @@ class ToolModule(PackageModule):
     A STELAR tool is defined in the data catalog. It is a package-derived 
     entity.
     """
+
+    __slots__ = ()
+
     CURSOR_NAME = "tools"
 
 
@@ -175,6 +234,9 @@ class WorkflowModule(PackageModule):
     A STELAR workflow is defined in the data catalog. It is a package-derived 
     entity.
     """
+
+    __slots__ = ()
+
     CURSOR_NAME = "workflows"
 
 
@@ -184,19 +246,26 @@ class ProcessModule(PackageModule):
     A STELAR process is defined in the data catalog. It is a package-derived 
     entity.
     """
+
+    __slots__ = ()
+
     CURSOR_NAME = "processes"
 
 
 class LicenseModule(Module):
+    __slots__ = ()
+
     CURSOR_NAME = "licenses"
 
-    def __init__(self, name: str, parent: Node|None = None, *, spec: dict = {}):
+    def __init__(self, name: str, parent: Node|None = None, *, spec: dict | None = None):
+        if spec is None:
+            spec = {}
         if "key" not in spec:
             spec["key"] = name
         super().__init__(name, parent, spec=spec)
 
     def cursor(self):
-        return getattr(self.catalog.client, self.CURSOR_NAME)
+        return self.catalog.cursor(self.CURSOR_NAME)
 
     def installed_instance(self):
         return self.cursor().get(self.spec["key"])
@@ -208,6 +277,10 @@ class LicenseModule(Module):
         """
         return self.spec["key"] in self.cursor()
 
+    @classmethod
+    def bulk_check_installed(cls, modules):
+        return _check_installed_by_listing(modules, "key")
+
     def install(self):
         """Install the package.
 
@@ -234,24 +307,34 @@ class VocabularyModule(Module):
     A STELAR vocabulary is defined in the data catalog. It is a package-derived 
     entity.
     """
-    def __init__(self, name: str, parent: Node|None = None, *, tags: list[str] = [], spec: dict = {}):
+
+    __slots__ = ()
+
+    CURSOR_NAME = "vocabularies"
+
+    def __init__(self, name: str, parent: Node|None = None, *, tags: list[str] | None = None,
+                 spec: dict | None = None):
+        if spec is None:
+            spec = {}
         if "name" not in spec:
             spec["name"] = name
         if "tags" not in spec:
-            spec["tags"] = tags
+            spec["tags"] = [] if tags is None else tags
 
         super().__init__(name, parent, spec=spec)
 
     def check_installed(self):
-        return self.spec["name"] in self.catalog.client.vocabularies
+        return self.spec["name"] in self.catalog.cursor(self.CURSOR_NAME)
+
+    @classmethod
+    def bulk_check_installed(cls, modules):
+        return _check_installed_by_listing(modules, "name")
     
     def install(self):
-        cli = self.catalog.client
-        cli.vocabularies.create(**self.spec)
+        self.catalog.cursor(self.CURSOR_NAME).create(**self.spec)
 
     def uninstall(self):
-        cli = self.catalog.client
-        cli.vocabularies.get(self.spec["name"]).delete()
+        self.catalog.cursor(self.CURSOR_NAME).get(self.spec["name"]).delete()
 
 
 class OrganizationModule(Module):
@@ -260,34 +343,44 @@ class OrganizationModule(Module):
     A STELAR organization is defined in the data catalog. It is a package-derived 
     entity.
     """
+
+    __slots__ = ()
+
     CURSOR_NAME = "organizations"
 
     def check_installed(self):
-        return self.spec["name"] in self.catalog.client.organizations
+        return self.spec["name"] in self.catalog.cursor(self.CURSOR_NAME)
+
+    @classmethod
+    def bulk_check_installed(cls, modules):
+        return _check_installed_by_listing(modules, "name")
 
     def install(self):
-        cli = self.catalog.client
-        cli.organizations.create(**self.spec)
+        self.catalog.cursor(self.CURSOR_NAME).create(**self.spec)
 
     def uninstall(self):
-        cli = self.catalog.client
-        cli.organizations.get(self.spec["name"]).delete()
+        self.catalog.cursor(self.CURSOR_NAME).get(self.spec["name"]).delete()
 
 
 class RelationshipModule(Module):
+    __slots__ = ()
 
     def __init__(self, name: str, parent: Optional[Node] = None, *, spec: dict):
         super().__init__(name, parent, spec=spec)
     
     def check_installed(self):
-        try:
-            subj = self.spec["subject"].installed_instance()
-            obj = self.spec["object"].installed_instance()
-            rel = self.spec["relationship"]
-
-            return Relationship.from_triple(subj, rel, obj).exists()
-        except Exception:
+        # A relationship cannot exist unless both its ends do; their installed
+        # state is usually known already, which saves the lookups below
+        subj_mod, obj_mod = self.spec["subject"], self.spec["object"]
+        if not (subj_mod.installed and obj_mod.installed):
             return False
+        # The lookups return None for entities that are missing on the server
+        subj = subj_mod.installed_instance()
+        obj = obj_mod.installed_instance()
+        if subj is None or obj is None:
+            return False
+        rel = self.spec["relationship"]
+        return Relationship.from_triple(subj, rel, obj).exists()
     
     def install(self):
         subj = self.spec["subject"].installed_instance()
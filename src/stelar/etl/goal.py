@@ -1,7 +1,5 @@
 from __future__ import annotations
-from collections import deque
-from typing import Callable
-from .base import Module, Package, Catalog, Node
+from .base import Module, Package, Catalog, Node, _LIST_SET, _flatten
 
 
 class Goal:
@@ -13,25 +11,33 @@ class Goal:
     catalog, the goal object returns True if the module is to be installed, False if the module is to be uninstalled, 
     and None if we don't care.
     """
+
+    __slots__ = ("catalog", "_goal", "_plan_key")
+
     def __init__(self, catalog: Catalog):
         self.catalog = catalog
-        self._goal = {}
+        # The goal of each module that has one
+        self._goal: dict[Module, bool] = {}
+        # The key of this goal in the plan cache of the catalog; reset by set_goal()
+        self._plan_key: frozenset | None = None
 
     def _modset(self, req):
-        """Get the set of modules in this goal.
+        """Iterate over the modules of a requirement.
 
-        The method returns a set of all the modules in this goal.
+        The method yields the modules named by a module, a package, a name, or a
+        (nested) list of them, without building any intermediate list.
         """
+        if isinstance(req, _LIST_SET):
+            for r in _flatten(req):
+                yield from self._modset_one(r)
+        else:
+            yield from self._modset_one(req)
+
+    def _modset_one(self, req):
         if isinstance(req, str):
             req = self.catalog.get(req)
-        if isinstance(req, list | set):
-            flatreq = []
-            for r in req:
-                flatreq.extend(self._modset(r))
-            return flatreq
-
         if not isinstance(req, Node):
-            raise ValueError(f"Adding {req} to {self.fullname}: requirement must be a module or a package")
+            raise ValueError(f"Adding {req} to goal: requirement must be a module or a package")
         
         if isinstance(req, Package):
             return req.modules()
@@ -41,31 +47,33 @@ class Goal:
 
     def set_goal(self, req, g, force=False):
         assert g in (True, False)
-        newinstalls = []
-
+        goal = self._goal
+        # The changes are collected first, so that the goal is left unchanged
+        # if there is a conflict
+        updates = {}
         for m in self._modset(req):
-            if m.fullname in self._goal and self._goal[m.fullname] is not g:
-                if not force:
-                    raise ValueError(f"Module {m.fullname} already in goal to uninstall, use force=True to override")
-            else:
-                newinstalls.append(m)
+            cur = goal.get(m)
+            if cur is not None and cur is not g and not force:
+                other = "install" if cur else "uninstall"
+                raise ValueError(f"Module {m.fullname} already in goal to {other}, use force=True to override")
+            updates[m] = g
 
-        for m in newinstalls:
-            self._goal[m.fullname] = g
+        goal.update(updates)
+        self._plan_key = None
 
     def install(self, req, force=False):
         """Set the goal of this module to install.
 
         The method sets the goal of this module to install.
         """
-        self.set_goal(req, True)
+        self.set_goal(req, True, force)
 
     def uninstall(self, req, force=False):
         """Set the goal of this module to uninstall.
 
         The method sets the goal of this module to uninstall.
         """
-        self.set_goal(req, False)
+        self.set_goal(req, False, force)
 
     def __or__(self, other):
         """Combine two goals.
@@ -76,18 +84,12 @@ class Goal:
             raise ValueError(f"Cannot combine {self.__class__.__name__} with a goal")
         if other.catalog != self.catalog:
             raise ValueError(f"Cannot combine {self.__class__.__name__} with a goal from another catalog")
-        newgoal = Goal(self.catalog)
-        newgoal._goal = self._goal.copy()
-
-        conflicts = []
-        for k, v in other._goal.items():
-            if k in newgoal._goal:
-                if newgoal._goal[k] != v:
-                    conflicts.append(k)
-            else:
-                newgoal._goal[k] = v
+        mine, theirs = self._goal, other._goal
+        conflicts = [k for k in mine.keys() & theirs.keys() if mine[k] != theirs[k]]
         if len(conflicts) > 0:
             raise ValueError("Conflicting goals for modules", conflicts)
+        newgoal = Goal(self.catalog)
+        newgoal._goal = {**mine, **theirs}
         return newgoal
 
     def logical_plan(self) -> tuple[list[Module], list[Module]]:
@@ -96,28 +98,38 @@ class Goal:
         The first list is the list of modules to be installed, and the second list is the list of modules to be uninstalled.
         The modules are sorted in the order of their strongly connected index (SCI). Therefore, these lists
         can be used to install and uninstall the modules in the correct order.
-        """
-
-        # the set of modules in the final state that need to be installed
-        I = set(self.catalog.get(m) for m, v in self._goal.items() if v)
 
-        # the set of modules in the final state that need to be uninstalled
-        U = set(self.catalog.get(m) for m, v in self._goal.items() if not v)
+        Plans are cached on the catalog, keyed by the content of the goal, until the
+        catalog structure changes.
+        """
+        key = self._plan_key
+        if key is None:
+            key = self._plan_key = frozenset(self._goal.items())
+        plan = self.catalog._plans.get(key)
+        if plan is None:
+            plan = self.catalog._plans[key] = self._compute_plan()
+        Ilist, Ulist = plan
+        return (list(Ilist), list(Ulist))
+
+    def _compute_plan(self) -> tuple[list[Module], list[Module]]:
+        # the sets of modules in the final state that need to be installed and
+        # uninstalled; they are augmented in place below
+        I = set()
+        U = set()
+        for m, v in self._goal.items():
+            (I if v else U).add(m)
 
-        
         # Augment goal to maintain module atomicity
-        I = add_all_modules(I)
-        U = add_all_modules(U)
-
+        add_all_modules(I)
+        add_all_modules(U)
 
         # Augment goal to maintain the requirement invariant
-        I = transitive_closure(I, lambda m: m.required)
-        U = transitive_closure(U, lambda m: m.enabled)
+        modules, ids, required, enabled = self.catalog._graph()
+        transitive_closure(I, modules, ids, required)
+        transitive_closure(U, modules, ids, enabled)
 
-        C = I & U
-        
-        if len(C) > 0:
-            raise ValueError("Conflict", C)
+        if I and U and not I.isdisjoint(U):
+            raise ValueError("Conflict", I & U)
 
         # compute the SCI for all modules
         self.catalog.strongly_connected_index()
@@ -129,6 +141,15 @@ class Goal:
         # the set of modules in the final state that need to be installed
         return (Ilist, Ulist)
 
+    def warmup(self):
+        """Prepare the reconciliation of this goal without contacting the KLMS.
+
+        The method computes the logical plan, so that conflicts are reported before
+        any operation is issued. The plan is kept in the plan cache of the catalog,
+        so a following reconcile() reuses it instead of computing it again.
+        """
+        self.logical_plan()
+
     def reconcile(self):
         """Reconcile the goal of this module.
 
@@ -136,6 +157,9 @@ class Goal:
         """
 
         Ilist, Ulist = self.logical_plan()
+        for m in self.catalog.all_modules():
+            m.clear_cache()
+        self.catalog.refresh_installed(Ilist + Ulist)
 
         for m in Ilist:
             m.do_install()
@@ -144,32 +168,38 @@ class Goal:
 
 
 def add_all_modules(S: set[Module]) -> set[Module]:
-    """Return a superset of a set of modules, expanding all top module groups.
+    """Extend a set of modules in place, expanding all top module groups.
 
     Two Module objects are peers if they have the same top module.
-    The returned set is a superset of S which is closed under the 'peer' relation.
+    The set S is extended to be closed under the 'peer' relation, and returned.
     """
     tops = {m.top_module for m in S}
-    Sx = set(tops)
+    S |= tops
     for top in tops:
-        peers = set(top.all_submodules())
-        Sx |= peers
-    return Sx
+        S.update(top.all_submodules())
+    return S
 
 
-def transitive_closure(S: set[Module], f: Callable[Module, set[Module]]) -> set[Module]:
+def transitive_closure(S: set[Module], modules: list[Module], ids: dict[Module, int],
+                       adj: list[list[int]]) -> set[Module]:
     """Compute the transitive closure of a set of modules.
 
-    The method computes the transitive closure of a set of modules by applying the given function to each module in the set.
-    The function is applied to each module in the set until no new modules are added to the set.
+    The closure is computed over a graph of integer module ids, as returned by
+    Catalog._graph(): adj[i] holds the ids of the modules that module i leads to
+    (its requirements, or the modules it enables). The set S is extended in place.
     """
-    Q = deque(S)
-    while Q:
-        m = Q.popleft()
-        for n in f(m):
-            if n not in S:
-                S.add(n)
-                Q.append(n)
+    visited = bytearray(len(modules))
+    stack = []
+    for m in S:
+        i = ids.get(m)
+        if i is None:
+            raise ValueError(f"Module {m.fullname} is not in the catalog of the goal")
+        visited[i] = 1
+        stack.append(i)
+    while stack:
+        for j in adj[stack.pop()]:
+            if not visited[j]:
+                visited[j] = 1
+                stack.append(j)
+                S.add(modules[j])
     return S
-
-
@@ -1,16 +1,37 @@
 """
     Module classes related to the S3 storage system.
 """
+from concurrent.futures import ThreadPoolExecutor
+
 from minio import S3Error
 
 from stelar.etl import Module, Node
 
+# The maximum number of S3 requests issued concurrently when checking modules
+_S3_WORKERS = 16
+
+
+def _check_installed_concurrently(modules: list[Module]) -> dict[Module, bool]:
+    """Check if modules are installed, issuing their S3 requests from a thread pool.
+
+    Each check is a single, independent S3 request, so running them concurrently
+    bounds the wall-clock time by the slowest requests instead of their sum.
+    """
+    if len(modules) == 1:
+        return {modules[0]: modules[0].check_installed()}
+    with ThreadPoolExecutor(max_workers=min(_S3_WORKERS, len(modules))) as pool:
+        return dict(zip(modules, pool.map(lambda m: m.check_installed(), modules)))
+
 
 class BucketModule(Module):
     """Bucket creation module
     """
 
-    def __init__(self, name: str, parent: Node = None, *, spec: dict = {}):
+    __slots__ = ()
+
+    def __init__(self, name: str, parent: Node = None, *, spec: dict | None = None):
+        if spec is None:
+            spec = {}
         if "bucket_name" not in spec:
             spec["bucket_name"] = name
         super().__init__(name, parent, spec=spec)
@@ -20,6 +41,10 @@ class BucketModule(Module):
         cli = self.catalog.client
         return cli.s3.bucket_exists(name)
 
+    @classmethod
+    def bulk_check_installed(cls, modules):
+        return _check_installed_concurrently(modules)
+
     def install(self):
         cli = self.catalog.client
         cli.s3.make_bucket(** self.spec)
@@ -44,8 +69,10 @@ class BucketModule(Module):
 class FileModule(Module):
     """File creation module"""
 
-    def __init__(self, name: str, parent: Node = None, *, spec):
-        super().__init__(name, parent, spec=spec)
+    __slots__ = ()
+
+    def __init__(self, name: str, parent: Node = None, *, spec, requires=()):
+        super().__init__(name, parent, spec=spec, requires=requires)
 
     def check_installed(self):
         cli = self.catalog.client
@@ -57,6 +84,10 @@ class FileModule(Module):
         except S3Error:
             return False
 
+    @classmethod
+    def bulk_check_installed(cls, modules):
+        return _check_installed_concurrently(modules)
+
     def install(self):
         cli = self.catalog.client
         cli.s3.fput_object(** self.spec)
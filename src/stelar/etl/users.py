@@ -1,5 +1,5 @@
 
-from .base import Module
+from .base import Module, _check_installed_by_listing
 
 class UserModule(Module):
     """A module that installs a user.
@@ -8,6 +8,8 @@ class UserModule(Module):
     entity.
     """
 
+    __slots__ = ()
+
     CURSOR_NAME = "users"
 
     def __init__(self, name: str, parent: Module = None, *, spec: dict):
@@ -18,22 +20,24 @@ class UserModule(Module):
         # Because users are not deletable, we are a bit more careful
         # about the spec. We need to check if the user exists and if it does,
         # we need to update it.
-        if any(k not in spec 
-               or 
-               not spec[k] 
-               for k in ("email", "email_verified", "first_name", "last_name", "password")):
-            raise ValueError(f"UserModule {name} is malformed")
+        for k in ("email", "email_verified", "first_name", "last_name", "password"):
+            if not spec.get(k):
+                raise ValueError(f"UserModule {name} is malformed: missing or empty field {k}")
 
         super().__init__(name, parent, spec=spec)
 
     def cursor(self):
-        return getattr(self.catalog.client, self.CURSOR_NAME)
+        return self.catalog.cursor(self.CURSOR_NAME)
 
     def check_installed(self):
         """Check if the user exists.
         The method checks if the user exists in the data catalog.
         """
         return self.spec["username"] in self.cursor()
+
+    @classmethod
+    def bulk_check_installed(cls, modules):
+        return _check_installed_by_listing(modules, "username")
     
     def install(self):
         """Install the user.
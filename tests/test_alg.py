@@ -1,4 +1,4 @@
-from stelar.etl import Catalog
+from stelar.etl import Module
 
 
 def test_sci(simple_catalog):
@@ -19,3 +19,17 @@ def test_sci(simple_catalog):
     assert simple_catalog.get("m5").scc_index == 2
     assert simple_catalog.get("m6").scc_index == 3
 
+
+
+def test_sci_recomputed_on_change(simple_catalog):
+    cat = simple_catalog
+    cat.strongly_connected_index()
+    assert cat.get("m6").scc_index == 3
+
+    # The cached SCI must not survive a new requirement
+    m7 = Module("m7")
+    cat.add(m7)
+    cat.get("m1").require(m7)
+    cat.strongly_connected_index()
+    assert m7.scc_index == 0
+    assert cat.get("m6").scc_index == 4
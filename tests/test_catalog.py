@@ -1,4 +1,6 @@
-from stelar.etl.base import Catalog, Module
+import pytest
+
+from stelar.etl.base import Catalog, Module, check_node_name
 
 
 def test_create_catalog():
@@ -37,3 +39,291 @@ def test_create_catalog():
     assert cat.get("m5") is m5
     assert cat.get("m6") is m6
 
+
+
+def test_get_package():
+    cat = Catalog()
+
+    p = cat.get_package("a.b.c")
+    assert p.fullname == "a.b.c"
+    assert cat.get_package("a.b.c") is p
+    assert cat.get_package("a.b") is p.parent
+
+    # A new package must not be confused with a root of the same name
+    cat.get_package("c")
+    assert cat.get_package("x.c").fullname == "x.c"
+
+
+def test_package_extend():
+    cat = Catalog()
+    pkg = cat.get_package("p")
+
+    m1 = Module("m1")
+    m2 = Module("m2")
+    pkg.extend([m1, m2])
+    pkg += [Module("m3")]
+
+    assert list(pkg.children) == ["m1", "m2", "m3"]
+    assert cat.get("p.m2") is m2
+
+
+def test_check_node_name():
+    for name in ("a", "_x", "klms-bucket", "a-b-c_1"):
+        check_node_name(name)
+    for name in ("", "1a", "-a", "a-", "a.b", "caf\u00e9", "a\n", "x" * 256):
+        with pytest.raises(ValueError):
+            check_node_name(name)
+
+
+def test_all_modules_cache():
+    cat = Catalog()
+    pkg = cat.get_package("p")
+    m1 = Module("m1", pkg)
+    assert list(cat.all_modules()) == [m1]
+
+    # Changes to the catalog structure must be visible
+    m2 = Module("m2", m1)
+    m3 = Module("m3")
+    cat.add(m3)
+    assert list(cat.all_modules()) == [m1, m2, m3]
+
+
+def test_get_subtree_added_later():
+    cat = Catalog()
+    top = Module("top")
+    sub = Module("sub", top)
+    leaf = Module("leaf", sub)
+    cat.get_package("p").add(top)
+
+    assert cat.get("p.top.sub.leaf") is leaf
+    assert leaf.catalog is cat
+    assert "p.top.sub" in cat
+    assert "p.top.x" not in cat
+
+
+def test_require_dedup():
+    m1 = Module("m1")
+    m2 = Module("m2")
+    m3 = Module("m3")
+    m3.require([m2, m1, m2])
+    m3.require(m1)
+
+    assert m3.required == [m2, m1]
+    assert m1.enabled == [m3]
+
+
+def test_hook_flags():
+    calls = []
+
+    class M(Module):
+        installed = False
+
+        def install(self):
+            calls.append("install")
+
+        def post_install(self):
+            calls.append("post_install")
+
+    class N(M):
+        pass
+
+    assert not Module._has_post_install
+    assert M._has_post_install and N._has_post_install
+    assert not M._has_pre_install
+
+    N("n").do_install()
+    assert calls == ["install", "post_install"]
+
+
+def test_require_by_name():
+    cat = Catalog()
+    pkg = cat.get_package("p")
+    m1 = Module("m1", pkg)
+    m2 = Module("m2", pkg)
+    m3 = Module("m3", cat.get_package("q"))
+
+    m3.require("p.m1")
+    assert m3.required == [m1]
+    m3.require("p")
+    assert m3.required == [m1, m2]
+
+    with pytest.raises(ValueError):
+        m3.require("p.nosuch")
+    with pytest.raises(ValueError):
+        Module("loose").require("p.m1")
+
+
+def test_top_module():
+    a = Module("a")
+    b = Module("b", a)
+    c = Module("c", b)
+    assert c.top_module is a
+
+    # Attaching a module tree below another module changes its top module
+    top = Module("top")
+    top.add(a)
+    assert c.top_module is top
+    assert a.top_module is top
+
+
+def test_add_nested_lists():
+    cat = Catalog()
+    m1, m2, m3 = Module("m1"), Module("m2"), Module("m3")
+    cat.add([m1, (m2, [m3])])
+    assert list(cat.all_modules()) == [m1, m2, m3]
+
+    m3.require([m1, [m2]])
+    assert m3.required == [m1, m2]
+
+
+def test_cursor_cache():
+    class FakeClient:
+        def __init__(self):
+            self.lookups = 0
+
+        @property
+        def datasets(self):
+            self.lookups += 1
+            return object()
+
+    cat = Catalog()
+    cli = cat.client = FakeClient()
+    assert cat.cursor("datasets") is cat.cursor("datasets")
+    assert cli.lookups == 1
+
+    # Replacing the client drops the cached cursors
+    cli2 = cat.client = FakeClient()
+    cat.cursor("datasets")
+    assert cli2.lookups == 1
+
+
+def test_check_installed_by_listing():
+    from stelar.etl.base import _LIST_PAGE, _check_installed_by_listing
+
+    names = [f"e{i}" for i in range(_LIST_PAGE + 5)]
+
+    class FakeCursor:
+        def fetch_list(self, *, limit, offset):
+            return names[offset:offset + limit]
+
+    class FakeClient:
+        things = FakeCursor()
+
+    class ThingModule(Module):
+        __slots__ = ()
+        CURSOR_NAME = "things"
+        looked_up = []
+
+        def check_installed(self):
+            self.looked_up.append(self.name)
+            return False
+
+    cat = Catalog()
+    cat.client = FakeClient()
+    mods = [ThingModule(n, spec={"name": n}) for n in ("e0", "e104", "x")]
+    cat.add(mods)
+
+    # Listed names need no lookup; the others are checked one by one
+    assert _check_installed_by_listing(mods, "name") == {mods[0]: True, mods[1]: True, mods[2]: False}
+    assert ThingModule.looked_up == ["x"]
+
+    # Pages of entities are read by the key
+    names[:] = [{"name": n} for n in ("e0", "x")]
+    assert _check_installed_by_listing(mods, "name") == {mods[0]: True, mods[1]: False, mods[2]: True}
+
+
+def test_bucket_bulk_check_installed():
+    from stelar.etl import BucketModule
+
+    class FakeS3:
+        def bucket_exists(self, name):
+            return name.startswith("b")
+
+    class FakeClient:
+        s3 = FakeS3()
+
+    cat = Catalog()
+    cat.client = FakeClient()
+    mods = [BucketModule(n) for n in ("b1", "x2", "b3")]
+    cat.add(mods)
+
+    assert BucketModule.bulk_check_installed(mods) == {mods[0]: True, mods[1]: False, mods[2]: True}
+    cat.refresh_installed()
+    assert [m.installed for m in mods] == [True, False, True]
+
+
+def test_relationship_missing_end():
+    from stelar.etl import DatasetModule, RelationshipModule
+
+    class GoneDataset(DatasetModule):
+        __slots__ = ()
+
+        def installed_instance(self):
+            return None
+
+    cat = Catalog()
+    subj = GoneDataset("subj", spec={})
+    obj = GoneDataset("obj", spec={})
+    rel = RelationshipModule("rel", spec={"subject": subj, "object": obj, "relationship": "links_to"})
+    cat.add([subj, obj, rel])
+
+    # The ends are believed installed, but are missing when looked up
+    subj.installed = obj.installed = True
+    assert rel.check_installed() is False
+
+
+def test_check_installed_by_listing_unpaged():
+    from stelar.etl.base import _LIST_PAGE, _check_installed_by_listing
+
+    names = [f"u{i}" for i in range(_LIST_PAGE + 5)]
+
+    class UnpagedCursor:
+        calls = 0
+
+        def fetch_list(self, *, limit, offset):
+            # Like the users cursor: limit and offset are ignored
+            self.calls += 1
+            return list(names)
+
+    cursor = UnpagedCursor()
+
+    class FakeClient:
+        things = cursor
+
+    class ThingModule(Module):
+        __slots__ = ()
+        CURSOR_NAME = "things"
+
+    cat = Catalog()
+    cat.client = FakeClient()
+    mods = [ThingModule(n, spec={"name": n}) for n in ("u0", "u104")]
+    cat.add(mods)
+
+    assert _check_installed_by_listing(mods, "name") == {mods[0]: True, mods[1]: True}
+    assert cursor.calls == 2
+
+
+def test_requires_single():
+    cat = Catalog()
+    pkg = cat.get_package("p")
+    m1 = Module("m1", parent=pkg)
+
+    # A single module, or a single name, is one requirement
+    m2 = Module("m2", parent=pkg, requires=m1)
+    m3 = Module("m3", parent=pkg, requires="p.m1")
+    assert m2.required == [m1]
+    assert m3.required == [m1]
+
+
+def test_resource_matches_live_spec():
+    from types import SimpleNamespace
+    from stelar.etl import DatasetModule
+
+    ds = DatasetModule("ds", spec={})
+    res = ds.add_resource("r", spec={"name": "R"})
+    found = SimpleNamespace(name="R", url="s3://b/r.csv")
+    assert res.matches(found)
+
+    # A spec completed after construction is used in the match
+    res.spec["url"] = "s3://b/other.csv"
+    assert not res.matches(found)
@@ -10,7 +10,7 @@ def test_goal_1(simple_catalog):
     goal = Goal(cat)
     goal.install("m3")
 
-    assert goal._goal["m3"] is True
+    assert goal._goal[cat.get("m3")] is True
     assert len(goal._goal) == 1
 
     I, U = goal.logical_plan()
@@ -30,7 +30,7 @@ def test_goal_2(simple_catalog):
     goal = Goal(cat)
     goal.install("m2")
 
-    assert goal._goal["m2"] is True
+    assert goal._goal[cat.get("m2")] is True
     assert len(goal._goal) == 1
 
     I, U = goal.logical_plan()
@@ -47,7 +47,7 @@ def test_goal_3(simple_catalog):
     goal = Goal(cat)
     goal.uninstall("m3")
 
-    assert goal._goal["m3"] is False
+    assert goal._goal[cat.get("m3")] is False
     assert len(goal._goal) == 1
 
     I, U = goal.logical_plan()
@@ -65,9 +65,96 @@ def test_goal_4(simple_catalog):
     goal.install("m3")
     goal.uninstall("m2")
 
-    assert goal._goal["m3"] is True
-    assert goal._goal["m2"] is False
+    assert goal._goal[cat.get("m3")] is True
+    assert goal._goal[cat.get("m2")] is False
     assert len(goal._goal) == 2
 
     with pytest.raises(ValueError):
         goal.install("m2")
+
+
+def test_goal_warmup(simple_catalog):
+    cat = simple_catalog
+
+    goal = Goal(cat)
+    goal.install("m3")
+    goal.uninstall("m1")
+
+    # The conflict is detected without touching any KLMS
+    with pytest.raises(ValueError):
+        goal.warmup()
+
+
+def test_goal_plan_cache(simple_catalog):
+    cat = simple_catalog
+
+    goal = Goal(cat)
+    goal.install("m1")
+    assert goal.logical_plan() == ([cat.get("m1")], [])
+
+    # The cached plan is dropped when the catalog structure changes
+    cat.get("m1").require("m3")
+    I, U = goal.logical_plan()
+    assert set(I) == {cat.get("m1"), cat.get("m3")}
+
+
+def test_goal_reconcile_bulk_check():
+    from stelar.etl import Catalog, Module
+
+    log = []
+
+    class FakeModule(Module):
+        __slots__ = ()
+
+        @classmethod
+        def bulk_check_installed(cls, modules):
+            log.append(("check", sorted(m.name for m in modules)))
+            return {m: m.name == "a" for m in modules}
+
+        def install(self):
+            log.append(("install", self.name))
+
+    cat = Catalog()
+    a = FakeModule("a")
+    b = FakeModule("b", requires=[a])
+    cat.add([a, b])
+
+    goal = Goal(cat)
+    goal.install(b)
+    goal.reconcile()
+
+    # The installed state is fetched once for all modules, before any operation
+    assert log == [("check", ["a", "b"]), ("install", "b")]
+    assert b.installed
+
+
+def test_goal_or(simple_catalog):
+    cat = simple_catalog
+
+    g1 = Goal(cat)
+    g1.install("m3")
+    g2 = Goal(cat)
+    g2.install(["m3", "m1"])
+    g2.uninstall("m6")
+
+    g = g1 | g2
+    assert g._goal == {cat.get("m3"): True, cat.get("m1"): True, cat.get("m6"): False}
+
+    g3 = Goal(cat)
+    g3.uninstall("m3")
+    with pytest.raises(ValueError):
+        g1 | g3
+
+
+def test_goal_set_conflict(simple_catalog):
+    cat = simple_catalog
+
+    goal = Goal(cat)
+    goal.install("m3")
+    with pytest.raises(ValueError):
+        goal.uninstall(["m1", "m3"])
+    # A conflict leaves the goal unchanged
+    assert goal._goal == {cat.get("m3"): True}
+
+    goal.uninstall(["m1", "m3"], force=True)
+    assert goal._goal == {cat.get("m3"): False, cat.get("m1"): False}
@@ -0,0 +1,26 @@
+import ast
+from pathlib import Path
+
+import stelar.etl
+
+
+def test_all_is_strings():
+    assert all(isinstance(x, str) for x in stelar.etl.__all__)
+
+
+def test_all_is_string_literals():
+    # Checked on the source, so that __all__ never needs its classes resolved
+    tree = ast.parse(Path(stelar.etl.__file__).read_text())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+                isinstance(t, ast.Name) and t.id == "__all__" for t in node.targets):
+            assert all(isinstance(e, ast.Constant) and isinstance(e.value, str)
+                       for e in node.value.elts)
+            break
+    else:
+        raise AssertionError("__all__ is not defined")
+
+
+def test_all_names_resolve():
+    for name in stelar.etl.__all__:
+        assert getattr(stelar.etl, name).__name__ == name